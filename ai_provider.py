@@ -1,11 +1,15 @@
 from fastapi import FastAPI, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict
+import os
 import uuid
+import hashlib
 import time
 import json
+import orjson
 import asyncio
 from datetime import datetime
 import uvicorn
@@ -13,7 +17,8 @@ import uvicorn
 app = FastAPI(
     title="AI Chat API",
     description="OpenAI-compatible chat completion API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -28,6 +33,10 @@ app.add_middleware(
 # Security
 security = HTTPBearer()
 
+# Set SIMULATE_STREAM_DELAY=1 (or true/yes) in the shell environment to pace
+# streamed responses for demos
+SIMULATE_STREAM_DELAY = os.getenv("SIMULATE_STREAM_DELAY", "").lower() in ("1", "true", "yes")
+
 # Models
 class Message(BaseModel):
     role: str = Field(..., description="Role of the message sender")
@@ -64,18 +73,6 @@ class ChatCompletionResponse(BaseModel):
     choices: List[Choice]
     usage: Usage
 
-class StreamChoice(BaseModel):
-    index: int
-    delta: Dict[str, Any]
-    finish_reason: Optional[str]
-
-class ChatCompletionStreamResponse(BaseModel):
-    id: str
-    object: str = "chat.completion.chunk"
-    created: int
-    model: str
-    choices: List[StreamChoice]
-
 class ModelInfo(BaseModel):
     id: str
     object: str = "model"
@@ -125,11 +122,41 @@ AVAILABLE_MODELS = {
     }
 }
 
+# AVAILABLE_MODELS is static, so the /v1/models payload is encoded once
+MODELS_RESPONSE_JSON = orjson.dumps(
+    ModelsResponse(
+        data=[ModelInfo(**model_info) for model_info in AVAILABLE_MODELS.values()]
+    ).model_dump()
+)
+
+# Mock responses; "{topic}" is filled with the start of the last message
+MOCK_RESPONSES = (
+    "I understand you're asking about: {topic}... Here's my response.",
+    "That's an interesting question. Let me think about that.",
+    "Based on what you've shared, I would suggest...",
+    "I can help you with that. Here are some thoughts:",
+    "That's a great point. From my perspective..."
+)
+
+GEMINI_MOCK_RESPONSES = (
+    "From Gemini's perspective on '{topic}...': Let me provide a comprehensive analysis.",
+    "Gemini here! That's a fascinating question that requires multimodal thinking.",
+    "Using Gemini's advanced reasoning capabilities, I can help you with that.",
+    "Gemini's response: I'll approach this systematically and provide detailed insights.",
+    "As Gemini, I can process this complex query and offer nuanced perspectives."
+)
+
 # Authentication
+# In production, validate against your database. Keys are stored as
+# SHA-256 digests so the lookup is a set probe on a fixed-size value.
+VALID_KEY_HASHES = frozenset(
+    hashlib.sha256(key.encode()).digest()
+    for key in ("sk-test123", "sk-prod456")  # Replace with actual key validation
+)
+
 async def verify_api_key(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    # In production, validate against your database
-    valid_keys = ["sk-test123", "sk-prod456"]  # Replace with actual key validation
-    if credentials.credentials not in valid_keys:
+    digest = hashlib.sha256(credentials.credentials.encode()).digest()
+    if digest not in VALID_KEY_HASHES:
         raise HTTPException(status_code=401, detail="Invalid API key")
     return credentials.credentials
 
@@ -142,27 +169,11 @@ def generate_ai_response(messages: List[Message], model: str, temperature: float
     last_message = messages[-1].content if messages else ""
     
     # Model-specific response styles
-    if model.startswith("gemini"):
-        responses = [
-            f"From Gemini's perspective on '{last_message[:50]}...': Let me provide a comprehensive analysis.",
-            "Gemini here! That's a fascinating question that requires multimodal thinking.",
-            "Using Gemini's advanced reasoning capabilities, I can help you with that.",
-            "Gemini's response: I'll approach this systematically and provide detailed insights.",
-            "As Gemini, I can process this complex query and offer nuanced perspectives."
-        ]
-    else:
-        # Original GPT-style responses
-        responses = [
-            f"I understand you're asking about: {last_message[:50]}... Here's my response.",
-            "That's an interesting question. Let me think about that.",
-            "Based on what you've shared, I would suggest...",
-            "I can help you with that. Here are some thoughts:",
-            "That's a great point. From my perspective..."
-        ]
+    responses = GEMINI_MOCK_RESPONSES if model.startswith("gemini") else MOCK_RESPONSES
     
-    # Simple hash-based selection for consistency
-    response_idx = hash(last_message) % len(responses)
-    base_response = responses[response_idx]
+    # Simple length-based selection for consistency
+    response_idx = len(last_message) % len(responses)
+    base_response = responses[response_idx].format(topic=last_message[:50])
     
     # Add some variation based on temperature
     if temperature > 1.0:
@@ -183,10 +194,9 @@ async def root():
 
 @app.get("/v1/models", response_model=ModelsResponse)
 async def list_models(api_key: str = Depends(verify_api_key)):
-    models = [ModelInfo(**model_info) for model_info in AVAILABLE_MODELS.values()]
-    return ModelsResponse(data=models)
+    return Response(content=MODELS_RESPONSE_JSON, media_type="application/json")
 
-@app.post("/v1/chat/completions")
+@app.post("/v1/chat/completions", response_model=ChatCompletionResponse)
 async def chat_completions(
     request: ChatCompletionRequest,
     api_key: str = Depends(verify_api_key)
@@ -203,7 +213,7 @@ async def chat_completions(
     )
     
     # Calculate tokens
-    prompt_tokens = sum(count_tokens(msg.content) for msg in request.messages)
+    prompt_tokens = count_tokens(" ".join(msg.content for msg in request.messages))
     completion_tokens = count_tokens(response_content)
     
     completion_id = f"chatcmpl-{uuid.uuid4().hex[:29]}"
@@ -212,46 +222,58 @@ async def chat_completions(
         # Streaming response
         async def generate_stream():
             words = response_content.split()
+            last_idx = len(words) - 1
+            # Every chat.completion.chunk shares id/created/model, so build the
+            # framing once and only encode the delta
+            prefix = (
+                f'data: {{"id":"{completion_id}","object":"chat.completion.chunk",'
+                f'"created":{int(time.time())},"model":'.encode()
+                + orjson.dumps(request.model)
+                + b',"choices":[{"index":0,"delta":{"content":'
+            )
+            mid_suffix = b'},"finish_reason":null}]}\n\n'
+            end_suffix = b'},"finish_reason":"stop"}]}\n\n'
             for i, word in enumerate(words):
-                chunk = ChatCompletionStreamResponse(
-                    id=completion_id,
-                    created=int(time.time()),
-                    model=request.model,
-                    choices=[StreamChoice(
-                        index=0,
-                        delta={"content": word + " "} if i < len(words) - 1 else {"content": word},
-                        finish_reason=None if i < len(words) - 1 else "stop"
-                    )]
-                )
-                yield f"data: {chunk.json()}\n\n"
-                await asyncio.sleep(0.1)  # Simulate streaming delay
+                if i < last_idx:
+                    yield prefix + orjson.dumps(word + " ") + mid_suffix
+                else:
+                    yield prefix + orjson.dumps(word) + end_suffix
+                if SIMULATE_STREAM_DELAY:
+                    await asyncio.sleep(0.1)
             
-            yield "data: [DONE]\n\n"
+            yield b"data: [DONE]\n\n"
         
         from fastapi.responses import StreamingResponse
-        return StreamingResponse(generate_stream(), media_type="text/plain")
+        return StreamingResponse(generate_stream(), media_type="text/event-stream")
     
     else:
-        # Regular response
-        return ChatCompletionResponse(
-            id=completion_id,
-            created=int(time.time()),
-            model=request.model,
-            choices=[Choice(
-                index=0,
-                message=Message(role="assistant", content=response_content),
-                finish_reason="stop"
-            )],
-            usage=Usage(
-                prompt_tokens=prompt_tokens,
-                completion_tokens=completion_tokens,
-                total_tokens=prompt_tokens + completion_tokens
-            )
-        )
+        # Regular response, shaped like ChatCompletionResponse but built as a
+        # plain dict since everything in it is generated server-side
+        return ORJSONResponse({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": response_content, "name": None},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        })
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(
+        "ai_provider:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=os.cpu_count()
+    )
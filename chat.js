@@ -9,6 +9,11 @@ document.addEventListener("DOMContentLoaded", function () {
     const charCount = document.getElementById("char-count");
     const welcomeTime = document.getElementById("welcome-time");
 
+    // Headers are identical for every message, so build them once
+    const requestHeaders = Object.freeze({
+        "Content-Type": "application/json",
+    });
+
     // Initialize
     init();
 
@@ -108,9 +113,7 @@ document.addEventListener("DOMContentLoaded", function () {
         try {
             const response = await fetch("/chat", {
                 method: "POST",
-                headers: {
-                    "Content-Type": "application/json",
-                },
+                headers: requestHeaders,
                 body: JSON.stringify({ message: userMessage }),
             });
 